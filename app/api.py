@@ -1,8 +1,9 @@
+import json
 import os
 from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from tempfile import NamedTemporaryFile
-from .rag import ingest_pdf, rag_query
+from .rag import ingest_pdf_async, rag_query_stream
 from .utils import deterministic_id
 
 app = FastAPI(title="KB RAG API")
@@ -17,10 +18,15 @@ async def ingest_endpoint(file: UploadFile = File(...)):
         tmp.write(await file.read())
         tmp.flush()
         doc_id = deterministic_id(file.filename)
-        count = ingest_pdf(tmp.name, doc_id=doc_id, doc_name=file.filename)
+        count = await ingest_pdf_async(tmp.name, doc_id=doc_id, doc_name=file.filename)
     return {"doc_id": doc_id, "chunks": count}
 
 @app.post("/query")
 async def query_endpoint(q: str = Form(...), k: int = Form(5)):
-    out = rag_query(q, k=k)
-    return JSONResponse(out)
+    # SSE stream: delta events as tokens arrive, then a final sources event.
+    # The sync generator is iterated in Starlette's threadpool, so the event
+    # loop stays free while Gemini streams.
+    def sse():
+        for event in rag_query_stream(q, k=k):
+            yield f"data: {json.dumps(event)}\n\n"
+    return StreamingResponse(sse(), media_type="text/event-stream")
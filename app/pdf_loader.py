@@ -1,13 +1,117 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from typing import List, Dict
-import pdfplumber
+
 from .utils import clean_text
 
+# PDFium (C++) extracts text 5-20x faster than pdfplumber's pure-Python
+# pdfminer stack; fall back to pdfplumber when it's unavailable or finds
+# no text in a document.
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Pages are sharded across worker processes for large documents; below this
+# page count the pool's startup cost outweighs the win.
+PDF_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+_PARALLEL_MIN_PAGES = 8
+
+# Ingestion only needs reading-order text, not bounding boxes; tight
+# tolerances without layout analysis keep pdfplumber off its slowest path.
+_PLUMBER_KWARGS = dict(x_tolerance=3, y_tolerance=3, layout=False)
+
+# One open handle per worker process: pool workers extract many pages from
+# the same document, so don't reopen and reparse the file on every call.
+_worker_docs = {}
+
+
+def _page_count(pdf_path: str) -> int:
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def _worker_doc(pdf_path: str):
+    doc = _worker_docs.get(pdf_path)
+    if doc is None:
+        # A worker serves one document per pool run; drop any stale handle.
+        for old in _worker_docs.values():
+            try:
+                old.close()
+            except Exception:
+                pass
+        _worker_docs.clear()
+        if pdfium is not None:
+            doc = pdfium.PdfDocument(pdf_path)
+        else:
+            import pdfplumber
+
+            doc = pdfplumber.open(pdf_path)
+        _worker_docs[pdf_path] = doc
+    return doc
+
+
+def _extract_page(pdf_path: str, page_number: int) -> Dict:
+    """Extract a single page; runs in a worker process with a shared handle."""
+    doc = _worker_doc(pdf_path)
+    if pdfium is not None:
+        page = doc[page_number - 1]
+        textpage = page.get_textpage()
+        txt = textpage.get_text_range() or ""
+        textpage.close()
+        page.close()
+    else:
+        txt = doc.pages[page_number - 1].extract_text(**_PLUMBER_KWARGS) or ""
+    return {"page": page_number, "text": clean_text(txt)}
+
+
+def _extract_with_pdfium(pdf_path: str) -> List[Dict]:
+    pages = []
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for i, page in enumerate(pdf, start=1):
+            textpage = page.get_textpage()
+            txt = textpage.get_text_range() or ""
+            textpage.close()
+            page.close()
+            pages.append({"page": i, "text": clean_text(txt)})
+    finally:
+        pdf.close()
+    return pages
+
+
+def _extract_with_pdfplumber(pdf_path: str) -> List[Dict]:
+    import pdfplumber
 
-def extract_pdf_text(pdf_path: str) -> List[Dict]:
-    """Returns list of {page, text} dicts."""
     pages = []
     with pdfplumber.open(pdf_path) as pdf:
         for i, page in enumerate(pdf.pages, start=1):
-            txt = page.extract_text() or ""
+            txt = page.extract_text(**_PLUMBER_KWARGS) or ""
             pages.append({"page": i, "text": clean_text(txt)})
     return pages
+
+
+def extract_pdf_text(pdf_path: str) -> List[Dict]:
+    """Returns list of {page, text} dicts."""
+    n = _page_count(pdf_path)
+    if PDF_WORKERS > 1 and n >= _PARALLEL_MIN_PAGES:
+        with ProcessPoolExecutor(max_workers=min(PDF_WORKERS, n)) as ex:
+            pages = list(ex.map(partial(_extract_page, pdf_path), range(1, n + 1)))
+    elif pdfium is not None:
+        pages = _extract_with_pdfium(pdf_path)
+    else:
+        pages = _extract_with_pdfplumber(pdf_path)
+
+    if pdfium is not None and not any(p["text"] for p in pages):
+        # No text anywhere via PDFium: let pdfplumber take a shot at the doc.
+        return _extract_with_pdfplumber(pdf_path)
+    return pages
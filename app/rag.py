@@ -1,16 +1,28 @@
 # app/rag.py
 
+import asyncio
+import datetime
+import functools
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
 
 from dotenv import load_dotenv
 load_dotenv()
 
-import google.generativeai as genai
+import numpy as np
+from bson.binary import Binary
 from pymongo.collection import Collection
-from pymongo import UpdateOne
+from pymongo import UpdateOne, WriteConcern
 
-from .db import get_collection
+from .db import (
+    get_collection,
+    get_cache_collection,
+    get_async_collection,
+    get_async_cache_collection,
+    ensure_async_indexes,
+)
 from .utils import chunk_text, deterministic_id, clean_text
 from .prompts import SYSTEM_RAG_INSTRUCTIONS, USER_TEMPLATE
 
@@ -18,9 +30,19 @@ from .prompts import SYSTEM_RAG_INSTRUCTIONS, USER_TEMPLATE
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 EMBED_MODEL = os.getenv("GEMINI_EMBED_MODEL", "text-embedding-004")
 GEN_MODEL   = os.getenv("GEMINI_GEN_MODEL",   "gemini-2.5-flash")
+EMBED_BATCH = int(os.getenv("GEMINI_EMBED_BATCH", "100"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "8"))
+
+# google.generativeai takes several hundred ms to import; load it on first
+# use so `/health`, test collection, and cold starts don't pay for it.
+genai = None
 
 # Configure Google client only if we have a key (safe to call multiple times)
 def _ensure_gemini_configured():
+    global genai
+    if genai is None:
+        import google.generativeai as _genai
+        genai = _genai
     if not GEMINI_API_KEY:
         raise RuntimeError(
             "GEMINI_API_KEY missing. Add it to your .env before running embeddings or generation."
@@ -28,28 +50,228 @@ def _ensure_gemini_configured():
     # idempotent; safe if called multiple times
     genai.configure(api_key=GEMINI_API_KEY)
 
-# Create a model handle (newer SDKs accept just the model name in the ctor)
-def _get_generative_model():
+# Explicit Gemini context cache for the constant system-instruction block.
+# "unset" -> not tried yet; None -> unavailable (instructions below the
+# model's minimum cacheable size, caching unsupported, no API key, ...).
+_cached_content = "unset"
+_cached_content_expiry = 0.0  # monotonic deadline for the live cache
+
+def _get_cached_content():
+    global _cached_content, _cached_content_expiry
+    if _cached_content == "unset":
+        ttl = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+        try:
+            from google.generativeai import caching
+            _cached_content = caching.CachedContent.create(
+                model=GEN_MODEL,
+                system_instruction=SYSTEM_RAG_INSTRUCTIONS,
+                ttl=datetime.timedelta(seconds=ttl),
+            )
+            # Refresh a minute ahead of the server-side TTL so we never
+            # generate against a cache the server has already dropped.
+            _cached_content_expiry = time.monotonic() + max(ttl - 60, 1)
+        except Exception:
+            # Fine: the instructions still lead every prompt, so models with
+            # implicit prefix caching (e.g. 2.5-flash) can hash-hit on them.
+            _cached_content = None
+    return _cached_content
+
+# Create a model handle (newer SDKs accept just the model name in the ctor).
+# Memoized: the ctor re-parses config on every call, and keeping one instance
+# preserves its binding to the CachedContent above. Failures (e.g. missing
+# API key) are not cached by lru_cache, so a later call can still succeed.
+@functools.lru_cache(maxsize=1)
+def _model_handle():
     _ensure_gemini_configured()
+    cache = _get_cached_content()
+    if cache is not None:
+        return genai.GenerativeModel.from_cached_content(cached_content=cache)
     try:
         return genai.GenerativeModel(GEN_MODEL)
     except TypeError:
         # Extreme fallback if API changes again
         return genai.GenerativeModel(str(GEN_MODEL))
 
+def _get_generative_model():
+    global _cached_content
+    # A lapsed context cache would make every generation fail until restart;
+    # forget it (and the model bound to it) so both get re-created.
+    if _cached_content not in (None, "unset") and time.monotonic() >= _cached_content_expiry:
+        _cached_content = "unset"
+        _model_handle.cache_clear()
+    return _model_handle()
+
 
 # ---------------- Embeddings ----------------
-def embed_texts(texts: List[str]) -> List[List[float]]:
-    """Embed a list of texts with Gemini embeddings (returns 768-dim vectors)."""
+def _run_async(coro):
+    """Run a coroutine from sync code, even if an event loop is already running
+    (e.g. when called from inside a FastAPI handler)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Already inside a loop: run the coroutine on its own loop in a worker thread.
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+
+def _embed_batch(batch: List[str], task_type: str) -> List[List[float]]:
+    """Embed one batch with a single `embed_content` RPC."""
+    r = genai.embed_content(model=EMBED_MODEL, content=batch, task_type=task_type)
+    emb = r["embedding"]
+    # list input -> list-of-lists; single string input -> one flat vector
+    if emb and isinstance(emb[0], float):
+        emb = [emb]
+    return emb
+
+
+async def _aembed_batch(batch: List[str], task_type: str, sem: asyncio.Semaphore) -> List[List[float]]:
+    async with sem:
+        return await asyncio.to_thread(_embed_batch, batch, task_type)
+
+
+def _normalize_rows(vecs: List[List[float]]) -> List[List[float]]:
+    """Scale each vector to unit length, so cosine similarity reduces to a dot
+    product for both the Atlas index and the Python rescore path."""
+    arr = np.asarray(vecs, dtype=np.float32)
+    norms = np.linalg.norm(arr, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (arr / norms).tolist()
+
+
+def embed_texts(texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+    """Embed a list of texts with Gemini embeddings (returns 768-dim vectors).
+
+    Texts are sliced into batches of GEMINI_EMBED_BATCH; batches are embedded
+    concurrently (up to EMBED_CONCURRENCY in flight) since the workload is
+    network-bound. Order of the returned vectors matches the input texts, and
+    every vector is normalized to unit length.
+    """
     _ensure_gemini_configured()
+    batches = [texts[i : i + EMBED_BATCH] for i in range(0, len(texts), EMBED_BATCH)]
+    if not batches:
+        return []
+    if len(batches) == 1:
+        return _normalize_rows(_embed_batch(batches[0], task_type))
+
+    async def _gather():
+        sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+        return await asyncio.gather(*[_aembed_batch(b, task_type, sem) for b in batches])
+
     out: List[List[float]] = []
-    for t in texts:
-        r = genai.embed_content(model=EMBED_MODEL, content=t)
-        out.append(r["embedding"])
-    return out
+    for emb in _run_async(_gather()):
+        out.extend(emb)
+    return _normalize_rows(out)
+
+
+def _embeddings_for(texts: List[str], col: Collection) -> List[List[float]]:
+    """Embed texts, reusing stored vectors for content already in the corpus.
+
+    Chunks repeated across documents (boilerplate headers, disclaimers, ...)
+    are looked up by content hash so the Gemini call covers only unseen text.
+    Duplicates within `texts` are also embedded once.
+    """
+    hashes = [deterministic_id(t) for t in texts]
+    vecs_by_hash: Dict[str, List[float]] = {}
+    for d in col.find(
+        {"text_hash": {"$in": list(set(hashes))}}, {"text_hash": 1, "embedding": 1}
+    ):
+        vecs_by_hash[d["text_hash"]] = d["embedding"]
+
+    todo: Dict[str, str] = {}
+    for h, t in zip(hashes, texts):
+        if h not in vecs_by_hash and h not in todo:
+            todo[h] = t
+    if todo:
+        vecs_by_hash.update(zip(todo.keys(), embed_texts(list(todo.values()))))
+    return [vecs_by_hash[h] for h in hashes]
+
+
+async def _embeddings_for_async(texts: List[str], col) -> List[List[float]]:
+    """motor twin of _embeddings_for."""
+    hashes = [deterministic_id(t) for t in texts]
+    vecs_by_hash: Dict[str, List[float]] = {}
+    async for d in col.find(
+        {"text_hash": {"$in": list(set(hashes))}}, {"text_hash": 1, "embedding": 1}
+    ):
+        vecs_by_hash[d["text_hash"]] = d["embedding"]
+
+    todo: Dict[str, str] = {}
+    for h, t in zip(hashes, texts):
+        if h not in vecs_by_hash and h not in todo:
+            todo[h] = t
+    if todo:
+        new = await asyncio.to_thread(embed_texts, list(todo.values()))
+        vecs_by_hash.update(zip(todo.keys(), new))
+    return [vecs_by_hash[h] for h in hashes]
 
 
 # ---------------- Ingestion / Upsert ----------------
+BULK_BATCH = int(os.getenv("MONGO_BULK_BATCH", "1000"))
+
+
+def _bulk_write_ops(col: Collection, ops: List[UpdateOne]) -> None:
+    """Submit ops in BULK_BATCH slices with an ingest-friendly write concern.
+
+    Slicing keeps any single bulk_write well under the 16 MB / 100k-op message
+    limits; w=1 without journal ack and skipping validation trims per-batch
+    latency on bulk ingestion.
+    """
+    if not ops:
+        return
+    wcol = col.with_options(write_concern=WriteConcern(w=1, j=False))
+    for i in range(0, len(ops), BULK_BATCH):
+        wcol.bulk_write(ops[i : i + BULK_BATCH], ordered=False, bypass_document_validation=True)
+
+
+async def _abulk_write_ops(col, ops: List[UpdateOne]) -> None:
+    """motor twin of _bulk_write_ops; `col` is an AsyncIOMotorCollection."""
+    if not ops:
+        return
+    wcol = col.with_options(write_concern=WriteConcern(w=1, j=False))
+    for i in range(0, len(ops), BULK_BATCH):
+        await wcol.bulk_write(ops[i : i + BULK_BATCH], ordered=False, bypass_document_validation=True)
+
+
+async def _write_via_thread(col: Collection, ops: List[UpdateOne]) -> None:
+    await asyncio.to_thread(_bulk_write_ops, col, ops)
+
+
+async def _embed_via_thread(texts: List[str], col: Collection) -> List[List[float]]:
+    return await asyncio.to_thread(_embeddings_for, texts, col)
+
+
+def _quantize_vec(emb: List[float]) -> Tuple[Binary, float]:
+    """Scalar-quantize a float vector to int8 bytes plus a per-vector scale.
+
+    768 int8 bytes instead of 768 floats cuts the stored vector 4x; the
+    original is recovered (approximately) as int8 * scale for rescoring.
+    """
+    arr = np.asarray(emb, dtype=np.float32)
+    scale = float(np.abs(arr).max()) / 127.0 or 1.0
+    q = np.round(np.clip(arr / scale, -127, 127)).astype(np.int8)
+    return Binary(q.tobytes()), scale
+
+
+def _chunk_update_op(doc_id: str, doc_name: str, page: int, text: str, emb: List[float]) -> UpdateOne:
+    chunk_id = deterministic_id(doc_id, str(page), text[:64])
+    emb_int8, emb_scale = _quantize_vec(emb)
+    filt = {"doc_id": doc_id, "chunk_id": chunk_id}
+    update = {
+        "$set": {
+            "doc_id": doc_id,
+            "chunk_id": chunk_id,
+            "text": text,
+            "text_hash": deterministic_id(text),
+            "embedding": emb,
+            "embedding_int8": emb_int8,
+            "embedding_scale": emb_scale,
+            "metadata": {"doc_name": doc_name, "page": page},
+        }
+    }
+    return UpdateOne(filt, update, upsert=True)
+
+
 def upsert_chunks(
     doc_id: str,
     doc_name: str,
@@ -62,28 +284,106 @@ def upsert_chunks(
         return 0
 
     texts = [c[1] for c in chunks]
-    vecs  = embed_texts(texts)
+    vecs  = _embeddings_for(texts, col)
 
-    ops: List[UpdateOne] = []
-    for (page, text), emb in zip(chunks, vecs):
-        chunk_id = deterministic_id(doc_id, str(page), text[:64])
-        filt = {"doc_id": doc_id, "chunk_id": chunk_id}
-        update = {
-            "$set": {
-                "doc_id": doc_id,
-                "chunk_id": chunk_id,
-                "text": text,
-                "embedding": emb,
-                "metadata": {"doc_name": doc_name, "page": page},
-            }
-        }
-        ops.append(UpdateOne(filt, update, upsert=True))
+    ops = [_chunk_update_op(doc_id, doc_name, page, text, emb)
+           for (page, text), emb in zip(chunks, vecs)]
+    _bulk_write_ops(col, ops)
+    return len(ops)
+
+
+async def upsert_chunks_async(
+    doc_id: str,
+    doc_name: str,
+    chunks: List[Tuple[int, str]],
+    col=None,
+) -> int:
+    """Async twin of upsert_chunks for the FastAPI/motor path."""
+    col = col if col is not None else get_async_collection()
+    if not chunks:
+        return 0
+    await ensure_async_indexes(col)
+
+    texts = [c[1] for c in chunks]
+    vecs = await _embeddings_for_async(texts, col)
 
-    if ops:
-        col.bulk_write(ops, ordered=False)
+    ops = [_chunk_update_op(doc_id, doc_name, page, text, emb)
+           for (page, text), emb in zip(chunks, vecs)]
+    await _abulk_write_ops(col, ops)
     return len(ops)
 
 
+async def _ingest_pipeline(
+    pdf_path: str,
+    doc_id: str,
+    doc_name: str,
+    chunk_size: int,
+    overlap: int,
+    col,
+    write=_write_via_thread,
+    embed=_embed_via_thread,
+) -> int:
+    """Extraction -> chunking -> embedding -> upsert as four queue-connected
+    tasks, so Mongo writes overlap embedding RPCs and PDF parsing instead of
+    each stage waiting for the previous one to finish the whole document."""
+    from .pdf_loader import extract_pdf_text
+
+    page_q: asyncio.Queue = asyncio.Queue(maxsize=64)
+    chunk_q: asyncio.Queue = asyncio.Queue(maxsize=EMBED_BATCH * 4)
+    embed_q: asyncio.Queue = asyncio.Queue(maxsize=8)
+    sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+    total = 0
+
+    async def produce_pages():
+        pages = await asyncio.to_thread(extract_pdf_text, pdf_path)
+        for p in pages:
+            await page_q.put(p)
+        await page_q.put(None)
+
+    async def produce_chunks():
+        while True:
+            p = await page_q.get()
+            if p is None:
+                break
+            txt = p.get("text") or ""
+            if not txt:
+                continue
+            for ch in chunk_text(txt, chunk_size=chunk_size, overlap=overlap):
+                await chunk_q.put((p["page"], ch))
+        await chunk_q.put(None)
+
+    async def embed_batches():
+        batch: List[Tuple[int, str]] = []
+        while True:
+            item = await chunk_q.get()
+            done = item is None
+            if not done:
+                batch.append(item)
+            if batch and (done or len(batch) >= EMBED_BATCH):
+                async with sem:
+                    vecs = await embed([c[1] for c in batch], col)
+                await embed_q.put((batch, vecs))
+                batch = []
+            if done:
+                break
+        await embed_q.put(None)
+
+    async def write_ops():
+        nonlocal total
+        while True:
+            item = await embed_q.get()
+            if item is None:
+                break
+            batch, vecs = item
+            ops = [_chunk_update_op(doc_id, doc_name, page, text, emb)
+                   for (page, text), emb in zip(batch, vecs)]
+            await write(col, ops)
+            total += len(ops)
+
+    await asyncio.gather(produce_pages(), produce_chunks(), embed_batches(), write_ops())
+    return total
+
+
 def ingest_pdf(
     pdf_path: str,
     doc_id: str,
@@ -92,39 +392,196 @@ def ingest_pdf(
     overlap: int = 200
 ) -> int:
     """Extract per-page text, chunk, embed, and upsert into MongoDB."""
+    _ensure_gemini_configured()
+    col = get_collection()
+    return _run_async(_ingest_pipeline(pdf_path, doc_id, doc_name, chunk_size, overlap, col))
+
+
+async def ingest_pdf_async(
+    pdf_path: str,
+    doc_id: str,
+    doc_name: str,
+    chunk_size: int = 1200,
+    overlap: int = 200
+) -> int:
+    """Async twin of ingest_pdf; writes through motor so the event loop never
+    blocks on Mongo."""
+    _ensure_gemini_configured()
+    col = get_async_collection()
+    await ensure_async_indexes(col)
+    return await _ingest_pipeline(
+        pdf_path, doc_id, doc_name, chunk_size, overlap, col,
+        write=_abulk_write_ops, embed=_embeddings_for_async,
+    )
+
+
+def ingest_pdfs(
+    docs: List[Tuple[str, str, str]],
+    chunk_size: int = 1200,
+    overlap: int = 200,
+    col: Collection = None,
+) -> Dict[str, int]:
+    """Ingest several PDFs in one shot.
+
+    `docs` is a list of (pdf_path, doc_id, doc_name) tuples. Chunks from every
+    file are pooled into a single embed_texts call and a single bulk_write, so
+    per-file fixed costs (short final embed batches, Mongo round-trips) are
+    paid once per run instead of once per file. Returns chunk counts per
+    doc_id.
+    """
     from .pdf_loader import extract_pdf_text
 
-    pages = extract_pdf_text(pdf_path)
-    all_chunks: List[Tuple[int, str]] = []
-    for p in pages:
-        txt = p.get("text") or ""
-        if not txt:
-            continue
-        for ch in chunk_text(txt, chunk_size=chunk_size, overlap=overlap):
-            all_chunks.append((p["page"], ch))
+    _ensure_gemini_configured()
+    col = col or get_collection()
+
+    entries: List[Tuple[str, str, int, str]] = []  # (doc_id, doc_name, page, text)
+    for pdf_path, doc_id, doc_name in docs:
+        for p in extract_pdf_text(pdf_path):
+            txt = p.get("text") or ""
+            if not txt:
+                continue
+            for ch in chunk_text(txt, chunk_size=chunk_size, overlap=overlap):
+                entries.append((doc_id, doc_name, p["page"], ch))
+
+    counts: Dict[str, int] = {doc_id: 0 for _, doc_id, _ in docs}
+    if not entries:
+        return counts
 
-    return upsert_chunks(doc_id, doc_name, all_chunks)
+    vecs = _embeddings_for([e[3] for e in entries], col)
+    ops: List[UpdateOne] = []
+    for (doc_id, doc_name, page, text), emb in zip(entries, vecs):
+        ops.append(_chunk_update_op(doc_id, doc_name, page, text, emb))
+        counts[doc_id] += 1
+    _bulk_write_ops(col, ops)
+    return counts
 
 
 # ---------------- Retrieval ----------------
-def vector_search(query: str, k: int = 5, col: Collection = None) -> List[Dict]:
-    """ANN retrieval via MongoDB Atlas Vector Search ($vectorSearch)."""
-    col = col or get_collection()
-    qvec = embed_texts([clean_text(query)])[0]
+def _default_num_candidates(k: int) -> int:
+    """Candidate pool for ANN search (the HNSW efSearch knob in Atlas terms).
+
+    Overridable outright via VS_NUM_CANDIDATES for benchmarking; otherwise
+    k * NUM_CAND_MULT (Atlas recommends 10-20x), floored at 50 and capped at
+    Atlas's 2000-candidate limit.
+    """
+    override = os.getenv("VS_NUM_CANDIDATES")
+    if override:
+        return int(override)
+    mult = int(os.getenv("NUM_CAND_MULT", "15"))
+    return max(50, min(k * mult, 2000))
 
-    pipeline = [
+
+# With a scalar-quantized Atlas index, ANN scores are approximate; fetch
+# k * oversample candidates and re-rank them with exact cosine over the
+# dequantized int8 vectors (768 bytes each, far cheaper to ship than floats).
+RESCORE_OVERSAMPLE = int(os.getenv("VS_RESCORE_OVERSAMPLE", "3"))
+
+
+def _vs_pipeline(qvec: List[float], k: int, num_candidates: int, index_name: str,
+                 include_int8: bool = False) -> List[Dict]:
+    project = {"_id": 0, "text": 1, "metadata": 1, "score": {"$meta": "vectorSearchScore"}}
+    if include_int8:
+        project["embedding_int8"] = 1
+        project["embedding_scale"] = 1
+    return [
         {
             "$vectorSearch": {
-                "index": "default",            # change if your index name differs
+                "index": index_name,
                 "path": "embedding",
                 "queryVector": qvec,
-                "numCandidates": max(50, k * 10),
+                "numCandidates": num_candidates,
                 "limit": k,
             }
         },
-        {"$project": {"text": 1, "metadata": 1, "score": {"$meta": "vectorSearchScore"}}},
+        {"$project": project},
+        # Belt-and-braces: never ship the 768-float vector (~6 KB/doc) over the
+        # wire, even if the $project above is later widened.
+        {"$unset": "embedding"},
     ]
-    return list(col.aggregate(pipeline))
+
+
+def _rescore(rows: List[Dict], qvec: List[float], k: int) -> List[Dict]:
+    """Exact re-rank of the oversampled candidate pool.
+
+    Stored and query vectors are unit-norm, so exact similarity is one
+    einsum dot product over the stacked candidate matrix — no per-candidate
+    norms needed. Exact dots are mapped to Atlas's (1 + dot) / 2 dotProduct
+    scale so they sort (and report in `sources`) on the same [0, 1] scale as
+    the ANN scores kept for pre-quantization docs.
+    """
+    q = np.asarray(qvec, dtype=np.float32)
+    mat, idxs = [], []
+    for i, r in enumerate(rows):
+        raw = r.pop("embedding_int8", None)
+        scale = r.pop("embedding_scale", None)
+        if raw is None or scale is None:
+            continue  # pre-quantization doc: keep the ANN score
+        mat.append(np.frombuffer(bytes(raw), dtype=np.int8).astype(np.float32) * scale)
+        idxs.append(i)
+    if mat:
+        scores = np.einsum("ij,j->i", np.stack(mat), q)
+        for i, s in zip(idxs, scores.tolist()):
+            rows[i]["score"] = (1.0 + float(s)) / 2.0
+    rows.sort(key=lambda r: float(r.get("score", 0.0)), reverse=True)
+    return rows[:k]
+
+
+def vector_search(
+    query: str,
+    k: int = 5,
+    num_candidates: int = None,
+    index_name: str = None,
+    col: Collection = None,
+    qvec: List[float] = None,
+) -> List[Dict]:
+    """ANN retrieval via MongoDB Atlas Vector Search ($vectorSearch).
+
+    Pass `qvec` to reuse an already-computed query embedding.
+    """
+    col = col if col is not None else get_collection()
+    fetch_k = k * RESCORE_OVERSAMPLE if RESCORE_OVERSAMPLE > 1 else k
+    if num_candidates is None:
+        num_candidates = _default_num_candidates(fetch_k)
+    else:
+        # Atlas requires numCandidates >= limit, and limit is fetch_k here.
+        num_candidates = max(num_candidates, fetch_k)
+    index_name = index_name or os.getenv("VS_INDEX", "default")
+    if qvec is None:
+        qvec = embed_texts([clean_text(query)], task_type="retrieval_query")[0]
+    rows = list(col.aggregate(
+        _vs_pipeline(qvec, fetch_k, num_candidates, index_name, include_int8=fetch_k > k)
+    ))
+    if fetch_k > k:
+        rows = _rescore(rows, qvec, k)
+    return rows
+
+
+async def vector_search_async(
+    query: str,
+    k: int = 5,
+    num_candidates: int = None,
+    index_name: str = None,
+    col=None,
+    qvec: List[float] = None,
+) -> List[Dict]:
+    """Async twin of vector_search for the FastAPI/motor path."""
+    col = col if col is not None else get_async_collection()
+    fetch_k = k * RESCORE_OVERSAMPLE if RESCORE_OVERSAMPLE > 1 else k
+    if num_candidates is None:
+        num_candidates = _default_num_candidates(fetch_k)
+    else:
+        # Atlas requires numCandidates >= limit, and limit is fetch_k here.
+        num_candidates = max(num_candidates, fetch_k)
+    index_name = index_name or os.getenv("VS_INDEX", "default")
+    if qvec is None:
+        qvec = (await asyncio.to_thread(embed_texts, [clean_text(query)], "retrieval_query"))[0]
+    cursor = col.aggregate(
+        _vs_pipeline(qvec, fetch_k, num_candidates, index_name, include_int8=fetch_k > k)
+    )
+    rows = await cursor.to_list(length=fetch_k)
+    if fetch_k > k:
+        rows = _rescore(rows, qvec, k)
+    return rows
 
 
 def build_context(results: List[Dict]) -> str:
@@ -139,35 +596,215 @@ def build_context(results: List[Dict]) -> str:
 
 
 # ---------------- Synthesis ----------------
+GEN_CONFIG = {"temperature": 0.2, "top_p": 0.9}
+
+
+def _build_prompt(question: str, results: List[Dict]) -> str:
+    context = build_context(results)
+    body = (
+        "Using ONLY the context below, answer succinctly.\n\n"
+        + f"# Question\n{question}\n\n# Context\n{context}"
+    )
+    if _get_cached_content() is not None:
+        # Instructions already live server-side in the cached content.
+        return body
+    # Stable block first so implicit prefix caching can hit on it.
+    return SYSTEM_RAG_INSTRUCTIONS + "\n\n" + body
+
+
+def _format_sources(results: List[Dict]) -> List[Dict]:
+    return [
+        {
+            "doc": r.get("metadata", {}).get("doc_name"),
+            "page": r.get("metadata", {}).get("page"),
+            "score": float(r.get("score", 0.0)),
+        }
+        for r in results
+    ]
+
+
 def synthesize_answer(question: str, results: List[Dict]) -> Dict:
     """Build a single-turn RAG prompt and generate an answer with Gemini."""
     model = _get_generative_model()
 
-    context = build_context(results)
-    prompt = (
-        SYSTEM_RAG_INSTRUCTIONS
-        + "\n\nUsing ONLY the context below, answer succinctly.\n\n"
-        + f"# Question\n{question}\n\n# Context\n{context}"
+    resp = model.generate_content(
+        [_build_prompt(question, results)],  # one combined user turn; no 'system'/'assistant' roles
+        generation_config=GEN_CONFIG,
     )
 
+    return {
+        "answer": getattr(resp, "text", "") or "",
+        "sources": _format_sources(results),
+    }
+
+
+def synthesize_answer_stream(question: str, results: List[Dict]):
+    """Yield answer text fragments as Gemini produces them."""
+    model = _get_generative_model()
     resp = model.generate_content(
-        [prompt],  # one combined user turn; no 'system'/'assistant' roles
-        generation_config={"temperature": 0.2, "top_p": 0.9},
+        [_build_prompt(question, results)],
+        generation_config=GEN_CONFIG,
+        stream=True,
     )
+    for chunk in resp:
+        txt = getattr(chunk, "text", "") or ""
+        if txt:
+            yield txt
+
+
+async def synthesize_answer_async(question: str, results: List[Dict]) -> Dict:
+    """Async twin of synthesize_answer.
+
+    Generation is I/O-bound and takes seconds; awaiting it lets one uvicorn
+    worker multiplex many in-flight generations. Uses the SDK's native async
+    call when present, otherwise falls back to a worker thread.
+    """
+    model = _get_generative_model()
+    prompt = _build_prompt(question, results)
+
+    if hasattr(model, "generate_content_async"):
+        resp = await model.generate_content_async([prompt], generation_config=GEN_CONFIG)
+    else:
+        resp = await asyncio.to_thread(
+            model.generate_content, [prompt], generation_config=GEN_CONFIG
+        )
 
     return {
         "answer": getattr(resp, "text", "") or "",
-        "sources": [
-            {
-                "doc": r.get("metadata", {}).get("doc_name"),
-                "page": r.get("metadata", {}).get("page"),
-                "score": float(r.get("score", 0.0)),
+        "sources": _format_sources(results),
+    }
+
+
+# ---------------- Query cache ----------------
+CACHE_SCORE_THRESHOLD = float(os.getenv("QUERY_CACHE_THRESHOLD", "0.97"))
+
+
+def _cache_lookup_pipeline(qvec: List[float]) -> List[Dict]:
+    return [
+        {
+            "$vectorSearch": {
+                "index": os.getenv("QUERY_CACHE_INDEX", "default"),
+                "path": "embedding",
+                "queryVector": qvec,
+                "numCandidates": 20,
+                "limit": 1,
             }
-            for r in results
-        ],
+        },
+        {"$project": {"answer": 1, "sources": 1, "score": {"$meta": "vectorSearchScore"}}},
+    ]
+
+
+def _cache_row_to_out(rows: List[Dict]) -> Dict:
+    if rows and float(rows[0].get("score", 0.0)) >= CACHE_SCORE_THRESHOLD:
+        return rows[0]
+    return None
+
+
+def _cache_doc(question: str, qvec: List[float], out: Dict) -> Dict:
+    return {
+        "question": clean_text(question),
+        "embedding": qvec,
+        "answer": out["answer"],
+        "sources": out["sources"],
+        "ts": time.time(),
     }
 
 
-def rag_query(question: str, k: int = 5) -> Dict:
-    hits = vector_search(question, k=k)
-    return synthesize_answer(question, hits)
+def _semantic_cache_lookup(qvec: List[float], cache: Collection) -> Dict:
+    """Find a previously answered near-identical question via $vectorSearch.
+
+    Returns the cached doc, or None on a miss (including when no vector index
+    exists on the cache collection yet).
+    """
+    try:
+        rows = list(cache.aggregate(_cache_lookup_pipeline(qvec)))
+    except Exception:
+        return None
+    return _cache_row_to_out(rows)
+
+
+async def _semantic_cache_lookup_async(qvec: List[float], cache) -> Dict:
+    try:
+        rows = await cache.aggregate(_cache_lookup_pipeline(qvec)).to_list(length=1)
+    except Exception:
+        return None
+    return _cache_row_to_out(rows)
+
+
+def rag_query(question: str, k: int = 5, num_candidates: int = None, index_name: str = None) -> Dict:
+    cache = get_cache_collection()
+    key = deterministic_id(clean_text(question), str(k))
+
+    # Tier 1: exact match on the normalized question.
+    hit = cache.find_one({"_id": key})
+    if hit:
+        return {"answer": hit.get("answer", ""), "sources": hit.get("sources", [])}
+
+    # Tier 2: semantic match against prior query embeddings.
+    qvec = embed_texts([clean_text(question)], task_type="retrieval_query")[0]
+    hit = _semantic_cache_lookup(qvec, cache)
+    if hit:
+        return {"answer": hit.get("answer", ""), "sources": hit.get("sources", [])}
+
+    hits = vector_search(question, k=k, num_candidates=num_candidates, index_name=index_name, qvec=qvec)
+    out = synthesize_answer(question, hits)
+    cache.replace_one({"_id": key}, _cache_doc(question, qvec, out), upsert=True)
+    return out
+
+
+def rag_query_stream(question: str, k: int = 5, num_candidates: int = None, index_name: str = None):
+    """Streaming variant of rag_query.
+
+    Yields {"type": "delta", "text": ...} events as tokens arrive, then one
+    final {"type": "sources", "sources": [...]}. Cache hits replay the whole
+    answer as a single delta; finished answers are written to the cache the
+    same as the buffered path.
+    """
+    cache = get_cache_collection()
+    key = deterministic_id(clean_text(question), str(k))
+
+    hit = cache.find_one({"_id": key})
+    if hit:
+        yield {"type": "delta", "text": hit.get("answer", "")}
+        yield {"type": "sources", "sources": hit.get("sources", [])}
+        return
+
+    qvec = embed_texts([clean_text(question)], task_type="retrieval_query")[0]
+    hit = _semantic_cache_lookup(qvec, cache)
+    if hit:
+        yield {"type": "delta", "text": hit.get("answer", "")}
+        yield {"type": "sources", "sources": hit.get("sources", [])}
+        return
+
+    hits = vector_search(question, k=k, num_candidates=num_candidates, index_name=index_name, qvec=qvec)
+    parts: List[str] = []
+    for txt in synthesize_answer_stream(question, hits):
+        parts.append(txt)
+        yield {"type": "delta", "text": txt}
+
+    out = {"answer": "".join(parts), "sources": _format_sources(hits)}
+    cache.replace_one({"_id": key}, _cache_doc(question, qvec, out), upsert=True)
+    yield {"type": "sources", "sources": out["sources"]}
+
+
+async def rag_query_async(question: str, k: int = 5, num_candidates: int = None, index_name: str = None) -> Dict:
+    """Async twin of rag_query; every Mongo hop goes through motor so
+    concurrent API queries don't serialize on the event loop."""
+    cache = get_async_cache_collection()
+    key = deterministic_id(clean_text(question), str(k))
+
+    hit = await cache.find_one({"_id": key})
+    if hit:
+        return {"answer": hit.get("answer", ""), "sources": hit.get("sources", [])}
+
+    qvec = (await asyncio.to_thread(embed_texts, [clean_text(question)], "retrieval_query"))[0]
+    hit = await _semantic_cache_lookup_async(qvec, cache)
+    if hit:
+        return {"answer": hit.get("answer", ""), "sources": hit.get("sources", [])}
+
+    hits = await vector_search_async(
+        question, k=k, num_candidates=num_candidates, index_name=index_name, qvec=qvec
+    )
+    out = await synthesize_answer_async(question, hits)
+    await cache.replace_one({"_id": key}, _cache_doc(question, qvec, out), upsert=True)
+    return out
@@ -14,7 +14,7 @@ import streamlit as st
 from dotenv import load_dotenv
 
 # Import your RAG pipeline pieces
-from app.rag import ingest_pdf, rag_query
+from app.rag import ingest_pdfs, rag_query_stream
 from app.utils import deterministic_id
 
 # Load environment variables
@@ -50,8 +50,8 @@ with st.sidebar:
             with st.status("Indexing…", expanded=True) as status:
                 total_chunks = 0
                 try:
+                    docs = []
                     for f in files:
-                        st.write(f"Processing **{f.name}** …")
                         data = io.BytesIO(f.read())
 
                         # Cross-platform temp file (Windows/macOS/Linux)
@@ -59,15 +59,16 @@ with st.sidebar:
                             tmp.write(data.getbuffer())
                             tmp_path = tmp.name
 
-                        count = ingest_pdf(
-                            tmp_path,
-                            doc_id=deterministic_id(f.name),
-                            doc_name=f.name,
-                            chunk_size=chunk_size,
-                            overlap=overlap,
-                        )
+                        docs.append((tmp_path, deterministic_id(f.name), f.name))
+
+                    # One call for all files: chunks are embedded and upserted
+                    # in a single global batch instead of per file.
+                    st.write(f"Processing {len(docs)} file(s) …")
+                    counts = ingest_pdfs(docs, chunk_size=chunk_size, overlap=overlap)
+                    for _, doc_id, doc_name in docs:
+                        count = counts.get(doc_id, 0)
                         total_chunks += count
-                        st.write(f"→ {count} chunks added/updated")
+                        st.write(f"→ **{doc_name}**: {count} chunks added/updated")
 
                     status.update(
                         label=f"Indexed {len(files)} file(s), {total_chunks} chunks total in this run.",
@@ -87,21 +88,37 @@ if "last_out" not in st.session_state:
     st.session_state.last_out = None
 
 col1, col2 = st.columns([2, 1])
+streamed_now = False
 
 with col1:
     if st.button("Search & Synthesize", type="primary", use_container_width=True):
         if not q.strip():
             st.error("Please enter a question.")
         else:
-            with st.spinner("Thinking with Gemini + Vector Search…"):
-                try:
-                    st.session_state.last_out = rag_query(q, k=k)
-                except Exception:
-                    st.error("Something went wrong while answering. See details below.")
-                    st.code(traceback.format_exc())
-
-    # Render answer (latest)
-    if st.session_state.last_out:
+            try:
+                events = rag_query_stream(q, k=k)
+                sources_holder = {}
+
+                def _deltas():
+                    for ev in events:
+                        if ev.get("type") == "delta":
+                            yield ev.get("text", "")
+                        elif ev.get("type") == "sources":
+                            sources_holder["sources"] = ev.get("sources", [])
+
+                st.markdown("### Answer")
+                answer = st.write_stream(_deltas())
+                st.session_state.last_out = {
+                    "answer": answer if isinstance(answer, str) else "".join(answer),
+                    "sources": sources_holder.get("sources", []),
+                }
+                streamed_now = True
+            except Exception:
+                st.error("Something went wrong while answering. See details below.")
+                st.code(traceback.format_exc())
+
+    # Render answer (latest) — skipped right after streaming to avoid doubling up
+    if st.session_state.last_out and not streamed_now:
         st.markdown("### Answer")
         st.write(st.session_state.last_out.get("answer", ""))
 